@@ -2,28 +2,142 @@
 Base Agent class for AWS Bedrock-powered agents.
 """
 
+import asyncio
 import boto3
-import json
+import botocore.config
+import hashlib
 import logging
-from typing import Any, Optional, List, Dict
+import orjson
+import re
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache, partial
+from typing import Any, Optional, Deque, Dict
 
 logger = logging.getLogger(__name__)
 
 
+@lru_cache(maxsize=8)
+def _get_bedrock_client(region: str):
+    """Shared per-region Bedrock client with a pooled HTTP session.
+
+    Client construction parses credentials and loads botocore service
+    models (~50-100 ms); sharing one client per region amortizes that and
+    lets concurrent agent calls reuse keep-alive connections.
+    """
+    return boto3.client(
+        "bedrock-runtime",
+        region_name=region,
+        config=botocore.config.Config(
+            max_pool_connections=50,
+            retries={"max_attempts": 3, "mode": "adaptive"},
+        ),
+    )
+
+# Cap concurrent Bedrock calls to stay within account rate limits. This is
+# a threading semaphore acquired inside the executor workers because calls
+# arrive from more than one event loop (the FastAPI loop and the
+# orchestrator's background loop for sync investigate()); an
+# asyncio.Semaphore binds to whichever loop parks the first waiter and
+# raises for waiters on any other.
+_BEDROCK_LIMIT = threading.BoundedSemaphore(8)
+
+# Dedicated pool for blocking Bedrock calls. asyncio.to_thread shares the
+# loop's default executor (min(32, cpus+4) workers) with every other
+# to_thread user; Bedrock calls hold a thread for seconds each, so give
+# them their own pool sized to the client's connection pool. The pool is
+# larger than the limiter on purpose: excess workers simply park on the
+# semaphore instead of queueing whole calls behind it
+_BEDROCK_EXECUTOR = ThreadPoolExecutor(max_workers=64, thread_name_prefix="bedrock")
+
+
+def _invoke_limited(fn, *args):
+    """Run a blocking Bedrock call under the shared concurrency cap."""
+    with _BEDROCK_LIMIT:
+        return fn(*args)
+
+# Bound the per-agent response cache
+_CACHE_MAX_ENTRIES = 512
+
+# Keep only the most recent interactions; an unbounded history accumulates
+# MBs of prompts and responses in long-running orchestrators
+_HISTORY_MAX_ENTRIES = 50
+
+# Markdown code fence around a JSON payload, found in one compiled-regex
+# pass instead of repeated str.split scans
+_JSON_FENCE = re.compile(r"```(?:json)?\s*(\{.*?\}|\[.*?\])\s*```", re.DOTALL)
+
+
+def _extract_json_block(text: str) -> Optional[str]:
+    """Return the largest balanced ``{...}`` block in text, or None.
+
+    A bare find/rfind slice breaks when the model appends commentary
+    containing braces, and re cannot match balanced nesting. This single
+    pass tracks brace depth while skipping string literals (including
+    escapes), so braces inside values never unbalance the scan.
+    """
+    best = None
+    depth = 0
+    start = -1
+    in_string = False
+    escaped = False
+    for i, ch in enumerate(text):
+        if in_string:
+            if escaped:
+                escaped = False
+            elif ch == "\\":
+                escaped = True
+            elif ch == '"':
+                in_string = False
+        elif ch == '"':
+            in_string = True
+        elif ch == "{":
+            if depth == 0:
+                start = i
+            depth += 1
+        elif ch == "}" and depth:
+            depth -= 1
+            if depth == 0 and (best is None or i + 1 - start > len(best)):
+                best = text[start:i + 1]
+    return best
+
+
 class BedrockAgent:
     """Base class for AWS Bedrock-powered agents."""
 
-    def __init__(self, agent_name: str, role: str, region: str = "us-east-1"):
+    def __init__(
+        self,
+        agent_name: str,
+        role: str,
+        region: str = "us-east-1",
+        performance_mode: str = "optimized",
+        cache_enabled: bool = True,
+        cache_ttl_seconds: float = 3600.0,
+    ):
         self.agent_name = agent_name
         self.role = role
-        self.bedrock = boto3.client("bedrock-runtime", region_name=region)
+        self.bedrock = _get_bedrock_client(region)
         # Use Amazon Nova Pro - more widely available
         self.model_id = "amazon.nova-pro-v1:0"
-        self.conversation_history: List[Dict[str, str]] = []
-
-    def invoke(self, prompt: str, context: Optional[Dict[str, Any]] = None) -> str:
-        """Invoke the agent with a prompt and optional context."""
-        system_prompt = f"""You are {self.agent_name}, a {self.role}.
+        # Bedrock latency-optimized inference; set to "standard" in regions
+        # where optimized latency is not supported
+        self.performance_mode = performance_mode
+        self.conversation_history: Deque[Dict[str, str]] = deque(
+            maxlen=_HISTORY_MAX_ENTRIES
+        )
+        # Exact-match response cache: repeated prompts (replays, demos,
+        # identical transactions) skip the Bedrock round-trip entirely
+        self.cache_enabled = cache_enabled
+        self.cache_ttl_seconds = cache_ttl_seconds
+        self._exact_cache: Dict[str, tuple] = {}
+        # Optional AsyncBedrockBatcher; when set, context-free ainvoke calls
+        # are micro-batched into shared Bedrock requests
+        self.batcher: Optional["AsyncBedrockBatcher"] = None
+        # agent_name, role, and responsibilities never change per instance,
+        # so build the system prompt once instead of on every invoke
+        self._system_prompt = f"""You are {self.agent_name}, a {self.role}.
 
 Your responsibilities:
 {self._get_responsibilities()}
@@ -31,32 +145,48 @@ Your responsibilities:
 Always provide clear, actionable insights based on the data provided.
 Respond in valid JSON format when requested."""
 
+    def invoke(self, prompt: str, context: Optional[Dict[str, Any]] = None) -> str:
+        """Invoke the agent with a prompt and optional context."""
+        system_prompt = self._system_prompt
+
         # Add context if provided
         full_prompt = prompt
         if context:
-            full_prompt = f"Context:\n{json.dumps(context, indent=2)}\n\nTask:\n{prompt}"
+            context_json = orjson.dumps(context, option=orjson.OPT_INDENT_2).decode()
+            full_prompt = f"Context:\n{context_json}\n\nTask:\n{prompt}"
+
+        cache_key = None
+        if self.cache_enabled:
+            cache_key = hashlib.blake2b(
+                (system_prompt + full_prompt).encode()
+            ).hexdigest()
+            cached = self._exact_cache.get(cache_key)
+            if cached is not None:
+                result, stored_at = cached
+                if time.monotonic() - stored_at < self.cache_ttl_seconds:
+                    return result
+                del self._exact_cache[cache_key]
 
         try:
-            # Use Nova-compatible format
-            response = self.bedrock.invoke_model(
+            # Use the Converse API - invoke_model routes performanceConfig
+            # through additionalModelRequestFields, which Nova rejects
+            response = self.bedrock.converse(
                 modelId=self.model_id,
-                body=json.dumps({
-                    "inferenceConfig": {
-                        "max_new_tokens": 2000,
-                        "temperature": 0.3,
-                    },
-                    "system": [{"text": system_prompt}],
-                    "messages": [
-                        {
-                            "role": "user",
-                            "content": [{"text": full_prompt}],
-                        }
-                    ],
-                }),
+                system=[{"text": system_prompt}],
+                messages=[
+                    {
+                        "role": "user",
+                        "content": [{"text": full_prompt}],
+                    }
+                ],
+                inferenceConfig={
+                    "maxTokens": 2000,
+                    "temperature": 0.3,
+                },
+                performanceConfig={"latency": self.performance_mode},
             )
 
-            response_body = json.loads(response["body"].read())
-            result = response_body["output"]["message"]["content"][0]["text"]
+            result = response["output"]["message"]["content"][0]["text"]
 
             # Store in conversation history
             self.conversation_history.append({
@@ -64,12 +194,26 @@ Respond in valid JSON format when requested."""
                 "response": result,
             })
 
+            if cache_key is not None:
+                if len(self._exact_cache) >= _CACHE_MAX_ENTRIES:
+                    # Drop the oldest entry (insertion-ordered dict)
+                    self._exact_cache.pop(next(iter(self._exact_cache)))
+                self._exact_cache[cache_key] = (result, time.monotonic())
+
             return result
 
         except Exception as e:
             logger.error(f"Error invoking Bedrock: {e}")
             raise
 
+    async def ainvoke(self, prompt: str, context: Optional[Dict[str, Any]] = None) -> str:
+        """Async variant of invoke, safe to run concurrently across agents."""
+        if self.batcher is not None and context is None:
+            return await self.batcher.submit(prompt)
+        return await asyncio.get_running_loop().run_in_executor(
+            _BEDROCK_EXECUTOR, partial(_invoke_limited, self.invoke, prompt, context)
+        )
+
     def _get_responsibilities(self) -> str:
         """Override in subclasses to define agent responsibilities."""
         return "General agent responsibilities"
@@ -78,24 +222,166 @@ Respond in valid JSON format when requested."""
         """Parse JSON from response, handling markdown wrapping."""
         try:
             # Try direct parse first
-            return json.loads(response)
-        except json.JSONDecodeError:
+            return orjson.loads(response)
+        except orjson.JSONDecodeError:
             pass
 
-        # Handle markdown code blocks
-        if "```json" in response:
-            json_str = response.split("```json")[1].split("```")[0].strip()
-        elif "```" in response:
-            json_str = response.split("```")[1].split("```")[0].strip()
+        # Handle markdown code blocks with a single scan; the memchr-speed
+        # substring test skips the regex engine entirely for the common
+        # fence-free malformed response
+        fence = _JSON_FENCE.search(response) if "```" in response else None
+        if fence:
+            json_str = fence.group(1)
         else:
-            json_str = response.strip()
+            # Extract the largest balanced object from the surrounding prose
+            json_str = _extract_json_block(response) or response.strip()
 
         try:
-            return json.loads(json_str)
-        except json.JSONDecodeError as e:
+            return orjson.loads(json_str)
+        except orjson.JSONDecodeError as e:
+            # A fenced block can itself be malformed; give the balanced
+            # scan one chance on the full response before giving up
+            if fence:
+                block = _extract_json_block(response)
+                if block is not None and block != json_str:
+                    try:
+                        return orjson.loads(block)
+                    except orjson.JSONDecodeError:
+                        pass
             logger.warning(f"Failed to parse JSON response: {e}")
             return {"raw_response": response, "parse_error": str(e)}
 
     def clear_history(self) -> None:
         """Clear conversation history."""
-        self.conversation_history = []
+        self.conversation_history.clear()
+
+    def clear_cache(self) -> None:
+        """Clear the response cache."""
+        self._exact_cache = {}
+
+
+class AsyncBedrockBatcher:
+    """Micro-batch concurrent prompts for one agent into shared Bedrock calls.
+
+    Under concurrent load (investigate_batch, bursty API traffic) several
+    coroutines often hit the same agent within a few milliseconds. Instead
+    of one Converse round-trip each, submitted prompts are queued and a
+    flush coroutine combines up to max_batch of them - whichever comes
+    first, the batch filling up or max_wait_ms elapsing - into a single
+    numbered prompt asking for a JSON array of answers. Each caller's
+    Future resolves to its own answer, re-serialized so downstream
+    _parse_json_response handling is unchanged.
+
+    Opt-in: attach with ``agent.batcher = AsyncBedrockBatcher(agent)``.
+    Single-transaction flows gain nothing from batching, so it is off by
+    default. If the model returns an unusable array, the batch falls back
+    to individual calls rather than failing the callers.
+    """
+
+    _BATCH_HEADER = (
+        "You will receive {n} independent tasks. Answer each one exactly as "
+        "its instructions specify. Return ONLY a JSON array with {n} "
+        "elements, where element i is the complete answer to task i+1 "
+        "(as a JSON object if the task asks for JSON, otherwise a string).\n"
+    )
+
+    def __init__(self, agent: BedrockAgent, max_batch: int = 8, max_wait_ms: float = 50.0):
+        self.agent = agent
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000.0
+        self._queue: "asyncio.Queue[tuple]" = asyncio.Queue()
+        self._flusher: Optional[asyncio.Task] = None
+
+    async def submit(self, prompt: str) -> str:
+        """Queue a prompt and wait for its slice of the batched response."""
+        future: asyncio.Future = asyncio.get_running_loop().create_future()
+        await self._queue.put((prompt, future))
+        if self._flusher is None or self._flusher.done():
+            self._flusher = asyncio.create_task(self._flush_loop())
+        return await future
+
+    async def _flush_loop(self) -> None:
+        """Collect queued prompts into batches until the queue drains."""
+        loop = asyncio.get_running_loop()
+        while not self._queue.empty():
+            batch = [self._queue.get_nowait()]
+            deadline = loop.time() + self.max_wait
+            try:
+                while len(batch) < self.max_batch:
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        break
+                    try:
+                        batch.append(
+                            await asyncio.wait_for(self._queue.get(), remaining)
+                        )
+                    except asyncio.TimeoutError:
+                        break
+                await self._flush(batch)
+            except Exception as e:
+                # Never let a flusher crash strand callers on their futures
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+
+    async def _flush(self, batch: list) -> None:
+        """Resolve a batch of (prompt, future) pairs with one Bedrock call."""
+        if len(batch) == 1:
+            prompt, future = batch[0]
+            await self._resolve_single(prompt, future)
+            return
+
+        parts = [self._BATCH_HEADER.format(n=len(batch))]
+        for i, (prompt, _) in enumerate(batch, start=1):
+            parts.append(f"\n--- Task {i} ---\n{prompt}")
+        combined = "".join(parts)
+
+        try:
+            response = await asyncio.get_running_loop().run_in_executor(
+                _BEDROCK_EXECUTOR, partial(_invoke_limited, self.agent.invoke, combined)
+            )
+            answers = self._split_answers(response, len(batch))
+        except Exception:
+            answers = None
+
+        if answers is None:
+            # Combined call unusable; fall back to one call per prompt
+            for prompt, future in batch:
+                await self._resolve_single(prompt, future)
+            return
+
+        for (_, future), answer in zip(batch, answers):
+            if not future.done():
+                if isinstance(answer, str):
+                    future.set_result(answer)
+                else:
+                    future.set_result(orjson.dumps(answer).decode())
+
+    def _split_answers(self, response: str, expected: int) -> Optional[list]:
+        """Extract the JSON array of answers, or None when malformed."""
+        try:
+            answers = orjson.loads(response)
+        except orjson.JSONDecodeError:
+            fence = _JSON_FENCE.search(response)
+            if not fence:
+                return None
+            try:
+                answers = orjson.loads(fence.group(1))
+            except orjson.JSONDecodeError:
+                return None
+        if not isinstance(answers, list) or len(answers) != expected:
+            return None
+        return answers
+
+    async def _resolve_single(self, prompt: str, future: asyncio.Future) -> None:
+        """Run one prompt on its own and resolve the caller's future."""
+        try:
+            result = await asyncio.get_running_loop().run_in_executor(
+                _BEDROCK_EXECUTOR, partial(_invoke_limited, self.agent.invoke, prompt)
+            )
+        except Exception as e:
+            if not future.done():
+                future.set_exception(e)
+        else:
+            if not future.done():
+                future.set_result(result)
@@ -2,24 +2,13 @@
 Fraud Investigator Agent - Primary fraud detection and investigation.
 """
 
-import json
 from typing import Any, Dict, List
 
 from .base_agent import BedrockAgent
 
-
-class FraudInvestigatorAgent(BedrockAgent):
-    """Agent specialized in fraud investigation."""
-
-    def __init__(self, region: str = "us-east-1"):
-        super().__init__(
-            agent_name="Fraud Investigator",
-            role="fraud detection specialist",
-            region=region,
-        )
-
-    def _get_responsibilities(self) -> str:
-        return """
+# Module-level constant so the responsibilities block is allocated once at
+# import instead of on every _get_responsibilities call
+_RESPONSIBILITIES = """
 - Analyze suspicious transactions for fraud indicators
 - Generate detailed investigation reports
 - Recommend actions (APPROVE, DECLINE, REVIEW)
@@ -28,28 +17,27 @@ class FraudInvestigatorAgent(BedrockAgent):
 - Identify specific fraud patterns and indicators
 """
 
-    def investigate_transaction(
-        self,
-        transaction: Dict[str, Any],
-        risk_score: float,
-        patterns: List[str],
-    ) -> Dict[str, Any]:
-        """Investigate a suspicious transaction."""
-        prompt = f"""Investigate this transaction for potential fraud:
+
+class FraudInvestigatorAgent(BedrockAgent):
+    """Agent specialized in fraud investigation."""
+
+    # Static prompt skeleton compiled once; per-call values are filled in
+    # via str.format instead of rebuilding the f-string every call
+    _PROMPT_TMPL = """Investigate this transaction for potential fraud:
 
 Transaction Details:
-- ID: {transaction['transaction_id']}
-- Amount: ${transaction['amount']}
-- From: {transaction['from_account']} → To: {transaction['to_account']}
-- Merchant: {transaction['merchant_category']}
-- Time: {transaction['timestamp']} (Hour: {transaction['hour']})
-- Device: {transaction['device_id']}
-- Location: {transaction['location']}
-- Transaction Velocity: {transaction.get('velocity', 'N/A')} transactions/hour
+- ID: {transaction_id}
+- Amount: ${amount}
+- From: {from_account} → To: {to_account}
+- Merchant: {merchant_category}
+- Time: {timestamp} (Hour: {hour})
+- Device: {device_id}
+- Location: {location}
+- Transaction Velocity: {velocity} transactions/hour
 
 Risk Assessment:
 - GNN Risk Score: {risk_score:.2f} (0-1 scale, higher = more suspicious)
-- Detected Patterns: {', '.join(patterns) if patterns else 'None'}
+- Detected Patterns: {patterns}
 
 Your task:
 1. Analyze all available information
@@ -69,7 +57,62 @@ Format your response as JSON:
 }}
 """
 
+    def __init__(self, region: str = "us-east-1"):
+        super().__init__(
+            agent_name="Fraud Investigator",
+            role="fraud detection specialist",
+            region=region,
+        )
+
+    def _get_responsibilities(self) -> str:
+        return _RESPONSIBILITIES
+
+    def investigate_transaction(
+        self,
+        transaction: Dict[str, Any],
+        risk_score: float,
+        patterns: List[str],
+    ) -> Dict[str, Any]:
+        """Investigate a suspicious transaction."""
+        prompt = self._build_investigation_prompt(transaction, risk_score, patterns)
         response = self.invoke(prompt)
+        return self._finalize_investigation(response)
+
+    async def investigate_transaction_async(
+        self,
+        transaction: Dict[str, Any],
+        risk_score: float,
+        patterns: List[str],
+    ) -> Dict[str, Any]:
+        """Async variant of investigate_transaction."""
+        prompt = self._build_investigation_prompt(transaction, risk_score, patterns)
+        response = await self.ainvoke(prompt)
+        return self._finalize_investigation(response)
+
+    def _build_investigation_prompt(
+        self,
+        transaction: Dict[str, Any],
+        risk_score: float,
+        patterns: List[str],
+    ) -> str:
+        """Build the fraud investigation prompt."""
+        return self._PROMPT_TMPL.format(
+            transaction_id=transaction['transaction_id'],
+            amount=transaction['amount'],
+            from_account=transaction['from_account'],
+            to_account=transaction['to_account'],
+            merchant_category=transaction['merchant_category'],
+            timestamp=transaction['timestamp'],
+            hour=transaction['hour'],
+            device_id=transaction['device_id'],
+            location=transaction['location'],
+            velocity=transaction.get('velocity', 'N/A'),
+            risk_score=risk_score,
+            patterns=', '.join(patterns) if patterns else 'None',
+        )
+
+    def _finalize_investigation(self, response: str) -> Dict[str, Any]:
+        """Parse the LLM response and ensure required fields."""
         result = self._parse_json_response(response)
 
         # Ensure required fields
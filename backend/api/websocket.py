@@ -3,11 +3,11 @@ WebSocket handlers for real-time fraud investigation updates.
 """
 
 import asyncio
-import json
 import logging
 from datetime import datetime
-from typing import Any, List, Dict, Optional
+from typing import Any, Dict, Iterable, Optional, Set
 
+import orjson
 from fastapi import WebSocket, WebSocketDisconnect
 import pandas as pd
 
@@ -18,46 +18,34 @@ class ConnectionManager:
     """Manage WebSocket connections."""
 
     def __init__(self):
-        self.active_connections: List[WebSocket] = []
-        self.investigation_subscribers: Dict[str, List[WebSocket]] = {}
+        # Sets keep membership checks and removal O(1); WebSocket objects
+        # hash by identity and no handler relies on iteration order.
+        self.active_connections: Set[WebSocket] = set()
+        self.investigation_subscribers: Dict[str, Set[WebSocket]] = {}
 
     async def connect(self, websocket: WebSocket) -> None:
         """Accept and register a new connection."""
         await websocket.accept()
-        self.active_connections.append(websocket)
+        self.active_connections.add(websocket)
         logger.info(f"Client connected. Total connections: {len(self.active_connections)}")
 
     def disconnect(self, websocket: WebSocket) -> None:
         """Remove a disconnected client."""
-        if websocket in self.active_connections:
-            self.active_connections.remove(websocket)
+        self.active_connections.discard(websocket)
 
         # Remove from investigation subscriptions
         for subscribers in self.investigation_subscribers.values():
-            if websocket in subscribers:
-                subscribers.remove(websocket)
+            subscribers.discard(websocket)
 
         logger.info(f"Client disconnected. Total connections: {len(self.active_connections)}")
 
     def subscribe_investigation(self, websocket: WebSocket, transaction_id: str) -> None:
         """Subscribe to investigation updates for a transaction."""
-        if transaction_id not in self.investigation_subscribers:
-            self.investigation_subscribers[transaction_id] = []
-        if websocket not in self.investigation_subscribers[transaction_id]:
-            self.investigation_subscribers[transaction_id].append(websocket)
+        self.investigation_subscribers.setdefault(transaction_id, set()).add(websocket)
 
     async def broadcast(self, message: Dict[str, Any]) -> None:
         """Broadcast message to all connected clients."""
-        disconnected = []
-        for connection in self.active_connections:
-            try:
-                await connection.send_json(message)
-            except Exception:
-                disconnected.append(connection)
-
-        # Clean up disconnected clients
-        for conn in disconnected:
-            self.disconnect(conn)
+        await self._fan_out(self.active_connections, message)
 
     async def send_to_investigation_subscribers(
         self,
@@ -65,24 +53,48 @@ class ConnectionManager:
         message: Dict[str, Any],
     ) -> None:
         """Send message to clients subscribed to a specific investigation."""
-        subscribers = self.investigation_subscribers.get(transaction_id, [])
-        disconnected = []
+        await self._fan_out(
+            self.investigation_subscribers.get(transaction_id, ()), message
+        )
 
-        for connection in subscribers:
-            try:
-                await connection.send_json(message)
-            except Exception:
-                disconnected.append(connection)
+    async def _fan_out(
+        self,
+        connections: Iterable[WebSocket],
+        message: Dict[str, Any],
+    ) -> None:
+        """Send one message to many clients concurrently.
 
-        # Clean up
-        for conn in disconnected:
-            self.disconnect(conn)
+        Serializes once with orjson and sends the bytes to every client
+        in parallel, so a single slow client no longer stalls the whole
+        broadcast. Clients whose send fails are disconnected.
+        """
+        if not connections:
+            return
+        payload = orjson.dumps(message, default=str)
+        connections = list(connections)
+        results = await asyncio.gather(
+            *(connection.send_bytes(payload) for connection in connections),
+            return_exceptions=True,
+        )
+        for connection, outcome in zip(connections, results):
+            if isinstance(outcome, Exception):
+                self.disconnect(connection)
 
 
 # Global connection manager
 manager = ConnectionManager()
 
 
+async def _send(websocket: WebSocket, message: Dict[str, Any]) -> None:
+    """Send one message to one client, serialized with orjson.
+
+    Every outbound path uses orjson rather than send_json's stdlib
+    dumps; default=str covers the odd non-JSON value (numpy scalars,
+    datetimes) that can surface in investigation results.
+    """
+    await websocket.send_bytes(orjson.dumps(message, default=str))
+
+
 async def websocket_endpoint(
     websocket: WebSocket,
     orchestrator: Any,
@@ -93,7 +105,7 @@ async def websocket_endpoint(
 
     try:
         # Send initial connection confirmation
-        await websocket.send_json({
+        await _send(websocket, {
             "type": "connected",
             "timestamp": datetime.now().isoformat(),
             "message": "Connected to Fraud Investigation System",
@@ -106,7 +118,7 @@ async def websocket_endpoint(
 
             if message_type == "subscribe_feed":
                 # Client wants to receive transaction feed updates
-                await websocket.send_json({
+                await _send(websocket, {
                     "type": "subscribed",
                     "feed": "transactions",
                 })
@@ -116,7 +128,7 @@ async def websocket_endpoint(
                 transaction_id = data.get("transaction_id")
                 if transaction_id:
                     manager.subscribe_investigation(websocket, transaction_id)
-                    await websocket.send_json({
+                    await _send(websocket, {
                         "type": "subscribed",
                         "investigation": transaction_id,
                     })
@@ -135,7 +147,7 @@ async def websocket_endpoint(
 
             elif message_type == "ping":
                 # Heartbeat
-                await websocket.send_json({
+                await _send(websocket, {
                     "type": "pong",
                     "timestamp": datetime.now().isoformat(),
                 })
@@ -164,7 +176,7 @@ async def handle_investigation_request(
         transaction = transactions_df[transactions_df["transaction_id"] == transaction_id]
 
         if transaction.empty:
-            await websocket.send_json({
+            await _send(websocket, {
                 "type": "error",
                 "message": f"Transaction {transaction_id} not found",
             })
@@ -173,7 +185,7 @@ async def handle_investigation_request(
         transaction_record = transaction.iloc[0].to_dict()
 
     # Send start notification
-    await websocket.send_json({
+    await _send(websocket, {
         "type": "investigation_start",
         "transaction_id": transaction_id,
         "timestamp": datetime.now().isoformat(),
@@ -200,24 +212,28 @@ async def handle_investigation_request(
     original_callback = orchestrator.on_step
     orchestrator.on_step = sync_callback
 
+    async def forward_event(event: Dict[str, Any]) -> None:
+        message = {
+            "type": event["event_type"],
+            "transaction_id": transaction_id,
+            "timestamp": datetime.now().isoformat(),
+            "data": event["data"],
+        }
+        await _send(websocket, message)
+        await manager.send_to_investigation_subscribers(transaction_id, message)
+
     async def process_queue():
-        """Process step events from queue."""
-        while True:
-            try:
-                event = await asyncio.wait_for(step_queue.get(), timeout=0.1)
-                message = {
-                    "type": event["event_type"],
-                    "transaction_id": transaction_id,
-                    "timestamp": datetime.now().isoformat(),
-                    "data": event["data"],
-                }
-                await websocket.send_json(message)
-                await manager.send_to_investigation_subscribers(transaction_id, message)
-            except asyncio.TimeoutError:
-                pass
-            except Exception as e:
-                logger.warning(f"Queue error: {e}")
-                break
+        """Forward step events to the client as they arrive."""
+        try:
+            while True:
+                await forward_event(await step_queue.get())
+        except asyncio.CancelledError:
+            # Flush anything the investigation queued before cancellation
+            while not step_queue.empty():
+                await forward_event(step_queue.get_nowait())
+            raise
+        except Exception as e:
+            logger.warning(f"Queue error: {e}")
 
     try:
         # Run investigation and queue processor concurrently
@@ -227,13 +243,16 @@ async def handle_investigation_request(
         # Start queue processor and investigation
         queue_task = asyncio.create_task(process_queue())
         result = await run_investigation()
-        
-        # Give queue time to process remaining events
-        await asyncio.sleep(0.5)
+
+        # Cancellation drains any remaining events before the task exits
         queue_task.cancel()
+        try:
+            await queue_task
+        except asyncio.CancelledError:
+            pass
 
         # Send completion
-        await websocket.send_json({
+        await _send(websocket, {
             "type": "investigation_complete",
             "transaction_id": transaction_id,
             "timestamp": datetime.now().isoformat(),
@@ -249,7 +268,7 @@ async def handle_investigation_request(
 
     except Exception as e:
         logger.error(f"Investigation error: {e}")
-        await websocket.send_json({
+        await _send(websocket, {
             "type": "investigation_error",
             "transaction_id": transaction_id,
             "error": str(e),
@@ -259,29 +278,36 @@ async def handle_investigation_request(
         orchestrator.on_step = original_callback
 
 
-async def simulate_transaction_feed(interval_seconds: float = 5.0) -> None:
-    """Simulate new transactions arriving (for demo purposes)."""
+def _simulated_transaction() -> Dict[str, Any]:
+    """Build one simulated transaction payload (runs off the event loop)."""
     import random
 
+    return {
+        "transaction_id": f"TXN{random.randint(100000, 999999):08d}",
+        "timestamp": datetime.now().isoformat(),
+        "from_account": f"ACC{random.randint(1000, 9999)}",
+        "to_account": f"ACC{random.randint(1000, 9999)}",
+        "amount": round(random.uniform(10, 5000), 2),
+        "merchant_category": random.choice([
+            "Groceries", "Gas", "Restaurant", "Shopping",
+            "Electronics", "Gift Cards",
+        ]),
+        "location": random.choice(["Home", "Work", "Local", "Unknown"]),
+        "hour": datetime.now().hour,
+        "is_fraud": 0,  # Will be determined by system
+    }
+
+
+async def simulate_transaction_feed(interval_seconds: float = 5.0) -> None:
+    """Simulate new transactions arriving (for demo purposes)."""
     while True:
         await asyncio.sleep(interval_seconds)
 
         if manager.active_connections:
-            # Generate a simulated new transaction
-            transaction = {
-                "transaction_id": f"TXN{random.randint(100000, 999999):08d}",
-                "timestamp": datetime.now().isoformat(),
-                "from_account": f"ACC{random.randint(1000, 9999)}",
-                "to_account": f"ACC{random.randint(1000, 9999)}",
-                "amount": round(random.uniform(10, 5000), 2),
-                "merchant_category": random.choice([
-                    "Groceries", "Gas", "Restaurant", "Shopping",
-                    "Electronics", "Gift Cards",
-                ]),
-                "location": random.choice(["Home", "Work", "Local", "Unknown"]),
-                "hour": datetime.now().hour,
-                "is_fraud": 0,  # Will be determined by system
-            }
+            # Build the payload in a worker thread so the event loop only
+            # runs the broadcast; if this path ever grows real scoring
+            # work (graph build + GNN forward), it stays off the loop
+            transaction = await asyncio.to_thread(_simulated_transaction)
 
             await manager.broadcast({
                 "type": "transaction_new",
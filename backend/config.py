@@ -2,35 +2,59 @@
 Configuration settings for the application.
 """
 
+import functools
 import os
 from dataclasses import dataclass
 from typing import Optional
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Settings:
-    """Application settings."""
+    """Application settings, read from the environment exactly once.
+
+    Frozen with slots: attribute reads skip the instance __dict__ and
+    nothing can mutate (or accidentally re-parse) a setting after
+    startup. Build instances through from_env().
+    """
 
     # AWS Bedrock settings
-    aws_region: str = os.getenv("AWS_REGION", "us-east-1")
-    bedrock_model_id: str = os.getenv(
-        "BEDROCK_MODEL_ID", "amazon.nova-pro-v1:0"
-    )
+    aws_region: str
+    bedrock_model_id: str
 
     # API settings
-    api_host: str = os.getenv("API_HOST", "0.0.0.0")
-    api_port: int = int(os.getenv("API_PORT", "8000"))
-    debug: bool = os.getenv("DEBUG", "false").lower() == "true"
+    api_host: str
+    api_port: int
+    debug: bool
 
     # Data settings
-    data_dir: str = os.getenv("DATA_DIR", "data")
-    num_transactions: int = int(os.getenv("NUM_TRANSACTIONS", "10000"))
-    fraud_rate: float = float(os.getenv("FRAUD_RATE", "0.05"))
+    data_dir: str
+    num_transactions: int
+    fraud_rate: float
 
     # LangFuse settings (optional)
-    langfuse_public_key: Optional[str] = os.getenv("LANGFUSE_PUBLIC_KEY")
-    langfuse_secret_key: Optional[str] = os.getenv("LANGFUSE_SECRET_KEY")
-    langfuse_host: str = os.getenv("LANGFUSE_HOST", "https://cloud.langfuse.com")
-
-
-settings = Settings()
+    langfuse_public_key: Optional[str]
+    langfuse_secret_key: Optional[str]
+    langfuse_host: str
+
+    @classmethod
+    @functools.cache
+    def from_env(cls) -> "Settings":
+        """Read the environment once and return the cached instance."""
+        return cls(
+            aws_region=os.getenv("AWS_REGION", "us-east-1"),
+            bedrock_model_id=os.getenv(
+                "BEDROCK_MODEL_ID", "amazon.nova-pro-v1:0"
+            ),
+            api_host=os.getenv("API_HOST", "0.0.0.0"),
+            api_port=int(os.getenv("API_PORT", "8000")),
+            debug=os.getenv("DEBUG", "false").lower() == "true",
+            data_dir=os.getenv("DATA_DIR", "data"),
+            num_transactions=int(os.getenv("NUM_TRANSACTIONS", "10000")),
+            fraud_rate=float(os.getenv("FRAUD_RATE", "0.05")),
+            langfuse_public_key=os.getenv("LANGFUSE_PUBLIC_KEY"),
+            langfuse_secret_key=os.getenv("LANGFUSE_SECRET_KEY"),
+            langfuse_host=os.getenv("LANGFUSE_HOST", "https://cloud.langfuse.com"),
+        )
+
+
+settings = Settings.from_env()
@@ -0,0 +1,41 @@
+"""
+Shared fixtures for the backend test suite.
+"""
+
+import pytest
+import pytest_asyncio
+from httpx import ASGITransport, AsyncClient
+from unittest.mock import patch
+
+
+@pytest_asyncio.fixture(scope="session")
+async def client():
+    """Session-scoped in-process API client.
+
+    ASGITransport routes requests straight into the FastAPI app without
+    TestClient's sync-to-async thread hop, and session scope builds the
+    app (and its data caches) once per run instead of per test.
+    """
+    from main import app
+
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as ac:
+        yield ac
+
+
+@pytest.fixture(scope="session")
+def agents():
+    """All three agents, instantiated once under a single mocked boto3.
+
+    The first agent import pulls in boto3/LangChain at module level, and
+    each construction would otherwise open its own patch context; one
+    session-scoped instance set amortizes both across every test that
+    only inspects agent attributes.
+    """
+    with patch("boto3.client"):
+        from agents.compliance_agent import ComplianceAgent
+        from agents.fraud_investigator import FraudInvestigatorAgent
+        from agents.risk_analyst import RiskAnalystAgent
+
+        return RiskAnalystAgent(), FraudInvestigatorAgent(), ComplianceAgent()
@@ -3,12 +3,9 @@ Tests for the Fraud Investigation Orchestrator.
 """
 
 import pytest
-from unittest.mock import MagicMock, patch, call
+from unittest.mock import AsyncMock, MagicMock, patch, call
 from typing import Dict, Any, List
 
-# Import the orchestrator
-import sys
-sys.path.insert(0, "..")
 from agents.orchestrator import FraudInvestigationOrchestrator
 
 
@@ -17,36 +14,49 @@ class TestOrchestratorEmitStep:
 
     @pytest.fixture
     def mock_agents(self):
-        """Create mock agents."""
+        """Create mock agents with the methods the graph nodes call."""
         mock_risk = MagicMock()
-        mock_risk.invoke.return_value = '{"risk_score": 0.8, "risk_level": "HIGH", "factors": ["large_amount"]}'
         mock_risk.agent_name = "Risk Analyst"
-        
+        mock_risk.analyze_risk.return_value = {
+            "risk_score": 0.8,
+            "risk_level": "High",
+            "patterns": ["large_amount"],
+            "risk_factors": ["large_amount"],
+        }
+
         mock_fraud = MagicMock()
-        mock_fraud.invoke.return_value = '{"is_fraud": true, "confidence": 0.9, "indicators": ["pattern_match"]}'
         mock_fraud.agent_name = "Fraud Investigator"
-        
+        mock_fraud.investigate_transaction_async = AsyncMock(return_value={
+            "recommendation": "DECLINE",
+            "fraud_likelihood": "High",
+            "confidence": 0.9,
+            "fraud_indicators": ["pattern_match"],
+        })
+
         mock_compliance = MagicMock()
-        mock_compliance.invoke.return_value = '{"compliant": false, "violations": ["aml_check"], "recommendation": "DECLINE"}'
         mock_compliance.agent_name = "Compliance Officer"
-        
+        mock_compliance.prefetch_compliance = AsyncMock(return_value={
+            "sar_required": False,
+            "compliance_notes": "prefetched",
+        })
+        mock_compliance.sar_likely.return_value = False
+        mock_compliance.finalize_compliance.return_value = {
+            "sar_required": False,
+            "compliance_notes": "No violations",
+        }
+
         return mock_risk, mock_fraud, mock_compliance
 
     @pytest.fixture
     def orchestrator_with_mocks(self, mock_agents):
-        """Create orchestrator with mocked agents."""
-        with patch("agents.orchestrator.RiskAnalystAgent") as mock_risk_cls, \
-             patch("agents.orchestrator.FraudInvestigatorAgent") as mock_fraud_cls, \
-             patch("agents.orchestrator.ComplianceAgent") as mock_compliance_cls:
-            
-            mock_risk_cls.return_value = mock_agents[0]
-            mock_fraud_cls.return_value = mock_agents[1]
-            mock_compliance_cls.return_value = mock_agents[2]
-            
-            orchestrator = FraudInvestigationOrchestrator()
-            return orchestrator
-
-    @pytest.mark.skip(reason="Complex LangGraph mocking - tested via integration tests")
+        """Create orchestrator with injected mock agents."""
+        mock_risk, mock_fraud, mock_compliance = mock_agents
+        return FraudInvestigationOrchestrator(
+            risk_agent=mock_risk,
+            fraud_agent=mock_fraud,
+            compliance_agent=mock_compliance,
+        )
+
     def test_emit_step_called_on_agent_thinking(self, orchestrator_with_mocks):
         """Test that agent_thinking events are emitted."""
         emitted_events: List[Dict[str, Any]] = []
@@ -76,7 +86,6 @@ class TestOrchestratorEmitStep:
         assert "Fraud Investigator" in agent_names
         assert "Compliance Officer" in agent_names
 
-    @pytest.mark.skip(reason="Complex LangGraph mocking - tested via integration tests")
     def test_emit_step_called_on_agent_result(self, orchestrator_with_mocks):
         """Test that agent_result events are emitted."""
         emitted_events: List[Dict[str, Any]] = []
@@ -109,26 +118,17 @@ class TestAgentNameMatching:
         "COMPLIANCE_OFFICER": "Compliance Officer",
     }
 
-    def test_risk_analyst_name_matches(self):
-        """Test Risk Analyst name matches frontend."""
-        with patch("boto3.client"):
-            from agents.risk_analyst import RiskAnalystAgent
-            agent = RiskAnalystAgent()
-            assert agent.agent_name == self.FRONTEND_AGENT_NAMES["RISK_ANALYST"]
-
-    def test_fraud_investigator_name_matches(self):
-        """Test Fraud Investigator name matches frontend."""
-        with patch("boto3.client"):
-            from agents.fraud_investigator import FraudInvestigatorAgent
-            agent = FraudInvestigatorAgent()
-            assert agent.agent_name == self.FRONTEND_AGENT_NAMES["FRAUD_INVESTIGATOR"]
-
-    def test_compliance_officer_name_matches(self):
-        """Test Compliance Officer name matches frontend."""
-        with patch("boto3.client"):
-            from agents.compliance_agent import ComplianceAgent
-            agent = ComplianceAgent()
-            assert agent.agent_name == self.FRONTEND_AGENT_NAMES["COMPLIANCE_OFFICER"]
+    @pytest.mark.parametrize(
+        "agent_index,frontend_key",
+        [
+            pytest.param(0, "RISK_ANALYST", id="risk_analyst"),
+            pytest.param(1, "FRAUD_INVESTIGATOR", id="fraud_investigator"),
+            pytest.param(2, "COMPLIANCE_OFFICER", id="compliance_officer"),
+        ],
+    )
+    def test_agent_name_matches_frontend(self, agents, agent_index, frontend_key):
+        """Each agent's name matches the frontend constant."""
+        assert agents[agent_index].agent_name == self.FRONTEND_AGENT_NAMES[frontend_key]
 
 
 class TestOrchestratorStateTransitions:
@@ -193,6 +193,13 @@ class TestOrchestratorStateTransitions:
         assert "risk_analysis" in state["steps"]
 
 
+@pytest.fixture(scope="module")
+def orchestrator_source():
+    """Orchestrator source text, read and tokenized once per module."""
+    import inspect
+    return inspect.getsource(FraudInvestigationOrchestrator)
+
+
 class TestEventTypes:
     """Test that event types match frontend expectations."""
 
@@ -203,21 +210,14 @@ class TestEventTypes:
         "investigation_complete",
     ]
 
-    def test_event_types_are_valid(self):
+    @pytest.mark.parametrize("event_type", EXPECTED_EVENT_TYPES)
+    def test_event_types_are_valid(self, event_type):
         """Test that all event types are valid strings."""
-        for event_type in self.EXPECTED_EVENT_TYPES:
-            assert isinstance(event_type, str)
-            assert len(event_type) > 0
-            assert "_" in event_type or event_type.isalpha()
+        assert isinstance(event_type, str)
+        assert len(event_type) > 0
+        assert "_" in event_type or event_type.isalpha()
 
-    def test_orchestrator_uses_correct_event_types(self):
+    @pytest.mark.parametrize("event_type", EXPECTED_EVENT_TYPES)
+    def test_orchestrator_uses_correct_event_types(self, orchestrator_source, event_type):
         """Test orchestrator emits correct event types."""
-        # Read the orchestrator source to verify event types
-        import inspect
-        from agents.orchestrator import FraudInvestigationOrchestrator
-        
-        source = inspect.getsource(FraudInvestigationOrchestrator)
-        
-        # Check that expected event types appear in source
-        assert "agent_thinking" in source
-        assert "agent_result" in source
+        assert event_type in orchestrator_source
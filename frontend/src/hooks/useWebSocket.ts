@@ -40,6 +40,8 @@ export function useWebSocket(): UseWebSocketReturn {
         setConnectionStatus('Connecting...');
         console.log('Connecting to WebSocket at:', WS_URL);
         const ws = new WebSocket(WS_URL);
+        // Broadcasts arrive as binary frames; avoid async Blob decoding
+        ws.binaryType = 'arraybuffer';
 
         ws.onopen = () => {
           isConnectingRef.current = false;
@@ -70,7 +72,10 @@ export function useWebSocket(): UseWebSocketReturn {
 
         ws.onmessage = (event) => {
           try {
-            const message: WSMessage = JSON.parse(event.data);
+            const raw = typeof event.data === 'string'
+              ? event.data
+              : new TextDecoder().decode(event.data);
+            const message: WSMessage = JSON.parse(raw);
             console.log('WebSocket message received:', message.type);
             setLastMessage(message);
             // Notify all handlers